@@ -1,22 +1,58 @@
 from flask import Blueprint, request, jsonify
 from app.services.search_service import EnhancedSearchTools
+from app.services.result_store import ResultStore, QUERY_PARAMS
 
 services_bp = Blueprint('services', __name__)
 search_tools = EnhancedSearchTools()
 
+def _wants_enrichment(data) -> bool:
+    """Cab searches return the local fare estimate unless web/LLM enrichment is requested"""
+    flag = request.args.get('enrich') or data.get('enrich')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def _refine(results):
+    """Apply filter/sort/pagination query params to the typed records of a search result"""
+    if not isinstance(results, dict) or not results.get('result_id'):
+        if any(request.args.get(name) for name in QUERY_PARAMS):
+            raise ValueError("filter, sort and paging parameters are not supported for this result")
+        return results
+    page = ResultStore.query(results['result_id'], request.args)
+    if page is None and isinstance(results.get('records'), list):
+        # Precomputed/cached results carry an ID from another process; store their records here
+        result_id = ResultStore.put(results.get('search_query') or results['result_id'], results['records'])
+        page = ResultStore.query(result_id, request.args)
+    if page:
+        results = {**results, **page}
+    return results
+
+@services_bp.route('/results/<result_id>', methods=['GET'])
+def query_results(result_id):
+    try:
+        page = ResultStore.query(result_id, request.args)
+        if page is None:
+            return jsonify({'error': 'Results not found or expired'}), 404
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to query results: {str(e)}'}), 500
+
 @services_bp.route('/flights/search', methods=['POST'])
 def search_flights():
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Request body is required'}), 400
+        ResultStore.parse_params(request.args)
             
         results = search_tools.search_flights(
             data.get('departure'),
             data.get('destination'),
             data.get('date')
         )
-        return jsonify(results)
+        return jsonify(_refine(results))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Flight search failed: {str(e)}'}), 500
 
@@ -26,13 +62,16 @@ def search_hotels():
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Request body is required'}), 400
+        ResultStore.parse_params(request.args)
             
         results = search_tools.search_hotels(
             data.get('destination'),
             data.get('checkin'),
             data.get('checkout')
         )
-        return jsonify(results)
+        return jsonify(_refine(results))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Hotel search failed: {str(e)}'}), 500
 
@@ -42,6 +81,7 @@ def search_transportation():
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Request body is required'}), 400
+        ResultStore.parse_params(request.args)
             
         results = {}
         
@@ -51,7 +91,7 @@ def search_transportation():
             data.get('destination'),
             data.get('date')
         )
-        results['trains'] = train_results
+        results['trains'] = _refine(train_results)
         
         # Search buses
         bus_results = search_tools.search_buses(
@@ -59,17 +99,20 @@ def search_transportation():
             data.get('destination'),
             data.get('date')
         )
-        results['buses'] = bus_results
+        results['buses'] = _refine(bus_results)
         
         # Search cabs
         cab_results = search_tools.search_intercity_cab(
             data.get('departure'),
             data.get('destination'),
-            data.get('date')
+            data.get('date'),
+            enrich=_wants_enrichment(data)
         )
-        results['cabs'] = cab_results
+        results['cabs'] = _refine(cab_results)
         
         return jsonify(results)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Transport search failed: {str(e)}'}), 500
 
@@ -79,11 +122,15 @@ def search_local_cabs():
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Request body is required'}), 400
+        ResultStore.parse_params(request.args)
             
         results = search_tools.search_local_cab(
             data.get('departure'),
-            data.get('destination')
+            data.get('destination'),
+            enrich=_wants_enrichment(data)
         )
-        return jsonify(results)
+        return jsonify(_refine(results))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
     except Exception as e:
         return jsonify({'error': f'Local cab search failed: {str(e)}'}), 500
\ No newline at end of file
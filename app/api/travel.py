@@ -1,10 +1,26 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, request, jsonify, Response, url_for
 from app.services.travel_service import SessionService
-from app.services.search_service import EnhancedSearchTools
+from app.services.search_service import EnhancedSearchTools, MULTICITY_MODES
+from app.services.job_service import JobService, JobQueueFull
+from app.http_cache import etag_for, not_modified
 
 travel_bp = Blueprint('travel', __name__)
 search_tools = EnhancedSearchTools()
 
+SSE_HEARTBEAT_SECONDS = 15
+SESSION_CACHE_CONTROL = 'private, no-cache'
+MAP_CACHE_CONTROL = 'public, max-age=86400'
+
+def _wants_job(data) -> bool:
+    flag = request.args.get('async') or (data or {}).get('async')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def _job_accepted(job):
+    job['status_url'] = url_for('travel.get_job', job_id=job['job_id'])
+    job['events_url'] = url_for('travel.job_events', job_id=job['job_id'])
+    return jsonify(job), 202
+
 @travel_bp.route('/sessions/create', methods=['POST'])
 def create_session():
     try:
@@ -20,9 +36,18 @@ def create_session():
 @travel_bp.route('/sessions/current/<session_key>', methods=['GET'])
 def get_current_session(session_key):
     try:
+        version = SessionService.get_version(session_key)
+        etag = etag_for('session', session_key, version)
+        cached = not_modified(etag, SESSION_CACHE_CONTROL) if version else None
+        if cached:
+            return cached
+
         session = SessionService.get_session(session_key)
         if session:
-            return jsonify(session)
+            response = jsonify(session)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = SESSION_CACHE_CONTROL
+            return response
         else:
             return jsonify({'error': 'Session not found'}), 404
     except Exception as e:
@@ -42,8 +67,14 @@ def generate_itinerary():
             'user_profile': data.get('user_profile') or {}
         }
         
+        if _wants_job(data):
+            job = JobService.submit('itinerary', search_tools.generate_intelligent_itinerary, travel_state)
+            return _job_accepted(job)
+
         itinerary = search_tools.generate_intelligent_itinerary(travel_state)
         return jsonify(itinerary)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': f'Itinerary generation failed: {str(e)}'}), 500
 
@@ -54,11 +85,44 @@ def get_travel_guide():
         if not data or 'destination' not in data:
             return jsonify({'error': 'destination is required'}), 400
             
+        if _wants_job(data):
+            job = JobService.submit('guide', search_tools.get_travel_guide, data['destination'])
+            return _job_accepted(job)
+
         guide_data = search_tools.get_travel_guide(data['destination'])
         return jsonify(guide_data)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': f'Failed to get travel guide: {str(e)}'}), 500
 
+@travel_bp.route('/multicity', methods=['POST'])
+def plan_multicity():
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('stops'), list) or len(data['stops']) < 2:
+            return jsonify({'error': 'stops must be a list of at least 2 locations'}), 400
+
+        stops = []
+        for stop in data['stops']:
+            if isinstance(stop, str):
+                stop = {'location': stop}
+            if not isinstance(stop, dict) or not isinstance(stop.get('location'), str) or not stop['location'].strip():
+                return jsonify({'error': 'each stop needs a location string'}), 400
+            if stop.get('date') is not None and not isinstance(stop['date'], str):
+                return jsonify({'error': 'stop date must be a string'}), 400
+            stops.append({'location': stop['location'], 'date': stop.get('date')})
+
+        modes = data.get('modes')
+        if modes is not None:
+            if not isinstance(modes, list) or not modes or any(m not in MULTICITY_MODES for m in modes):
+                return jsonify({'error': f"modes must be a non-empty list of: {', '.join(MULTICITY_MODES)}"}), 400
+
+        plan = search_tools.plan_multicity(stops, modes)
+        return jsonify(plan)
+    except Exception as e:
+        return jsonify({'error': f'Multi-city planning failed: {str(e)}'}), 500
+
 @travel_bp.route('/map', methods=['GET'])
 def generate_map():
     try:
@@ -66,8 +130,53 @@ def generate_map():
         lon = request.args.get('lon', 78.9629, type=float)
         zoom = request.args.get('zoom', 4, type=int)
         
+        # The rendered map depends only on its parameters, so skip rendering when the client has it
+        etag = etag_for('map', lat, lon, zoom)
+        cached = not_modified(etag, MAP_CACHE_CONTROL)
+        if cached:
+            return cached
+        
         from app.services.search_service import LocationService
         map_data = LocationService.create_map(lat, lon, zoom)
-        return jsonify({'map_base64': map_data})
+        response = jsonify({'map_base64': map_data})
+        if map_data:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = MAP_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = 'no-store'
+        return response
     except Exception as e:
-        return jsonify({'error': f'Map generation failed: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Map generation failed: {str(e)}'}), 500
+
+@travel_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = JobService.get_job(job_id)
+        if job:
+            return jsonify(job)
+        else:
+            return jsonify({'error': 'Job not found'}), 404
+    except Exception as e:
+        return jsonify({'error': f'Failed to get job: {str(e)}'}), 500
+
+@travel_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    if not JobService.get_job(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+
+    def stream():
+        while True:
+            finished = JobService.wait(job_id, SSE_HEARTBEAT_SECONDS)
+            job = JobService.get_job(job_id)
+            if not job:
+                yield "event: error\ndata: {\"error\": \"Job expired\"}\n\n"
+                return
+            if finished and JobService.is_finished(job):
+                yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+                return
+            yield f"event: status\ndata: {json.dumps({'job_id': job_id, 'status': job['status']})}\n\n"
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,105 @@
+"""ETag / If-None-Match handling and response compression for the travel and services blueprints.
+
+Views that know a cheap content version (session version, map parameters)
+call not_modified() before doing any work. Every other 200 response gets a
+strong ETag hashed from its body. Bodies of at least COMPRESS_MIN_SIZE bytes
+are then gzip or brotli encoded according to Accept-Encoding.
+"""
+import os
+import gzip
+import hashlib
+from typing import Optional
+from flask import request, Response
+
+# Brotli is optional; gzip is always available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+CACHED_BLUEPRINTS = ('travel', 'services')
+ENCODING_SUFFIXES = ('-br', '-gzip')
+
+
+def etag_for(*parts) -> str:
+    """Strong ETag value derived from a content version rather than the body"""
+    return hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=16).hexdigest()
+
+
+def _base_etag(etag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)]
+    return etag
+
+
+def _matches(etag: str) -> bool:
+    if not request.if_none_match:
+        return False
+    if request.if_none_match.star_tag:
+        return True
+    return any(_base_etag(tag) == etag for tag in request.if_none_match.as_set())
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Optional[Response]:
+    """304 response when the client already holds this version, else None.
+
+    cache_control should match what the full 200 response would send.
+    """
+    if not _matches(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def _choose_encoding() -> Optional[str]:
+    if BROTLI_AVAILABLE and request.accept_encodings['br'] > 0:
+        return 'br'
+    if request.accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def init_http_caching(app):
+    @app.after_request
+    def conditional_and_compressed(response):
+        if request.blueprint not in CACHED_BLUEPRINTS or request.method not in ('GET', 'POST'):
+            return response
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        etag = response.get_etag()[0]
+        # Views mark failed or one-off bodies no-store; those get no ETag and are never revalidated
+        if not etag and not response.cache_control.no_store:
+            etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+        if etag:
+            if request.method == 'GET' and _matches(etag):
+                response.set_etag(etag)
+                response.status_code = 304
+                response.set_data(b'')
+                response.headers.pop('Content-Length', None)
+                return response
+            response.set_etag(etag)
+
+        encoding = _choose_encoding()
+        body = response.get_data()
+        if not encoding or response.content_encoding or len(body) < COMPRESS_MIN_SIZE:
+            return response
+        if encoding == 'br':
+            body = brotli.compress(body, quality=min(COMPRESS_LEVEL, 11))
+        else:
+            body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        response.set_data(body)
+        response.content_encoding = encoding
+        if etag:
+            # Each encoding is a distinct representation, so it needs its own strong ETag
+            response.set_etag(f"{etag}-{encoding}")
+        return response
@@ -21,6 +21,18 @@ def create_app():
         }
     })
     
+    # Opt-in per-request profiling (no-op unless PROFILE_SAMPLE_RATE/PROFILE_SECRET is set)
+    from app.profiling import init_profiling
+    init_profiling(app)
+    
+    # ETags, 304s and gzip/brotli compression for the travel and services APIs
+    from app.http_cache import init_http_caching
+    init_http_caching(app)
+    
+    # Serve precomputed guides/routes first when an artifact is present
+    from app.services.precompute_service import PrecomputedStore
+    PrecomputedStore.load()
+    
     # Register blueprints (equivalent to FastAPI routers)
     from app.api.travel import travel_bp
     from app.api.chat import chat_bp
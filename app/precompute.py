@@ -0,0 +1,169 @@
+"""Offline batch precompute for travel guides, itineraries and popular route searches.
+
+Usage:
+    python -m app.precompute --destinations goa,mumbai --routes pune:goa,pune:mumbai
+    python -m app.precompute --popular-routes --workers 4 --rate 1.5
+"""
+import argparse
+import itertools
+import threading
+import time
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+from app.services.search_service import EnhancedSearchTools, DeepLinkGenerator
+from app.services.precompute_service import ArtifactBuilder, DEFAULT_ARTIFACT_PATH
+
+ROUTE_MODES = ('flights', 'trains', 'buses', 'intercity_cab')
+# Fallback text the search/LLM helpers return instead of raising; never worth caching
+FAILURE_MARKERS = (
+    "Error generating response",
+    "Groq API not available",
+    "Sorry, I couldn't generate a proper response",
+    "AI processing not available",
+    "AI processing error",
+    "Web search could not be completed",
+    "No web search tool is available",
+    "Itinerary generation is currently unavailable",
+)
+
+
+class RateLimiter:
+    """Spaces task starts so that at most `rate` tasks begin per second across all workers"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _split(value: str):
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def _day_counts(value: str):
+    """argparse type for --itinerary-days: comma-separated positive trip lengths"""
+    try:
+        days = [int(d) for d in _split(value)]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated whole numbers, got '{value}'")
+    if any(d < 1 for d in days):
+        raise argparse.ArgumentTypeError(f"trip lengths must be at least 1 day, got '{value}'")
+    return days
+
+
+def _check_result(result, label: str):
+    """Raise if a result carries an error or helper fallback text anywhere inside it"""
+    if isinstance(result, dict):
+        if result.get('error'):
+            raise ValueError(f"{label}: {result['error']}")
+        for value in result.values():
+            _check_result(value, label)
+    elif isinstance(result, list):
+        for value in result:
+            _check_result(value, label)
+    elif isinstance(result, str):
+        for marker in FAILURE_MARKERS:
+            if marker in result:
+                raise ValueError(f"{label}: {result[:200]}")
+    return result
+
+
+def build_tasks(args, search_tools: EnhancedSearchTools, builder: ArtifactBuilder):
+    destinations = _split(args.destinations)
+    routes = [tuple(r.split(':', 1)) for r in _split(args.routes) if ':' in r]
+    if args.popular_routes:
+        routes.extend(itertools.permutations(DeepLinkGenerator.IATA_CODES.keys(), 2))
+        destinations.extend(DeepLinkGenerator.IATA_CODES.keys())
+    destinations = list(dict.fromkeys(d.lower() for d in destinations))
+    routes = list(dict.fromkeys((d.strip().lower(), a.strip().lower()) for d, a in routes))
+
+    tasks = []
+    for city in destinations:
+        def run_guide(c=city):
+            guide = _check_result(search_tools.get_travel_guide(c), f"guide {c}")
+            builder.add_guide(c, guide)
+        tasks.append((f"guide {city}", run_guide))
+
+    for dep, dest in routes:
+        for mode in ROUTE_MODES:
+            def run_route(m=mode, d=dep, a=dest):
+                result = getattr(search_tools, f"search_{m}")(d, a, args.date)
+                _check_result(result, f"{m} {d}->{a}")
+                builder.add_route(m, d, a, args.date, result)
+            tasks.append((f"{mode} {dep}->{dest}", run_route))
+
+        for days in args.itinerary_days:
+            def run_itinerary(d=dep, a=dest, n=days):
+                travel_dates = None
+                if n > 1:
+                    start = date(2000, 1, 1)
+                    travel_dates = {'departure': start.isoformat(), 'return': (start + timedelta(days=n - 1)).isoformat()}
+                travel_state = {
+                    'departure_location': d,
+                    'destination_location': a,
+                    'travel_dates': travel_dates,
+                    'user_profile': {}
+                }
+                itinerary = search_tools.generate_intelligent_itinerary(travel_state)
+                _check_result(itinerary, f"itinerary {d}->{a} ({n}d)")
+                builder.add_itinerary(d, a, n, itinerary)
+            tasks.append((f"itinerary {dep}->{dest} ({days}d)", run_itinerary))
+
+    return tasks
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Precompute travel guides, itineraries and route searches")
+    parser.add_argument('--destinations', default='', help="Comma-separated cities to build guides for")
+    parser.add_argument('--routes', default='', help="Comma-separated departure:destination pairs")
+    parser.add_argument('--popular-routes', action='store_true', help="Include every city pair in DeepLinkGenerator.IATA_CODES")
+    parser.add_argument('--itinerary-days', type=_day_counts, default=[1], help="Comma-separated trip lengths to precompute itineraries for")
+    parser.add_argument('--date', default=None, help="Travel date for route searches (omit for undated searches)")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel workers")
+    parser.add_argument('--rate', type=float, default=1.0, help="Max tasks started per second (0 = unlimited)")
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH, help="Artifact path")
+    args = parser.parse_args(argv)
+
+    search_tools = EnhancedSearchTools(use_precomputed=False)
+    if not search_tools.llm:
+        parser.error("GROQ_API_KEY is required to precompute guides and itineraries")
+    builder = ArtifactBuilder()
+    limiter = RateLimiter(args.rate)
+    tasks = build_tasks(args, search_tools, builder)
+    if not tasks:
+        parser.error("nothing to precompute: pass --destinations, --routes or --popular-routes")
+
+    def run(label, func):
+        limiter.acquire()
+        func()
+        return label
+
+    print(f"Precomputing {len(tasks)} tasks with {args.workers} workers...")
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(run, label, func): label for label, func in tasks}
+        for future in as_completed(futures):
+            try:
+                print(f"  done: {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"  failed: {futures[future]}: {e}")
+
+    counts = builder.write(args.output)
+    print(f"Wrote {args.output}: {counts} ({failures} failed)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
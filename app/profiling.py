@@ -0,0 +1,177 @@
+"""Opt-in per-request sampling profiler.
+
+Enabled by PROFILE_SAMPLE_RATE (fraction of requests, 0-1) and/or
+PROFILE_SECRET (profile any request carrying a valid X-Profile-Token
+header, see sign_profile_token). When neither is set no hooks are
+registered, so disabled profiling costs nothing.
+
+Each profiled request writes <timestamp>_<route>_<ms>ms_<session>.folded
+(collapsed stacks) and .speedscope.json into PROFILE_DIR, keeping at most
+PROFILE_MAX_FILES profiles.
+"""
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+
+def sign_profile_token(secret: str, path: str, ttl: int = 300) -> str:
+    """Build an X-Profile-Token value for path, valid for ttl seconds"""
+    expires = int(time.time()) + ttl
+    signature = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def _valid_token(secret: str, token: str, path: str) -> bool:
+    try:
+        expires, signature = token.split('.', 1)
+        if int(expires) < time.time():
+            return False
+    except ValueError:
+        return False
+    expected = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class RequestSampler(threading.Thread):
+    """Samples the call stack of one thread at a fixed interval until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True, name=f"profiler-{thread_id}")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+def _session_key() -> str:
+    key = (request.view_args or {}).get('session_key') or request.args.get('session_key')
+    if not key and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            key = body.get('session_key')
+    return str(key) if key else 'nosession'
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', value).strip('-')[:60] or 'root'
+
+
+def _write_profile(directory: str, max_files: int, sampler: RequestSampler, meta: dict):
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, "{}_{}_{}ms_{}".format(
+        datetime.now().strftime("%Y%m%dT%H%M%S%f"), _slug(meta['route']),
+        int(meta['duration_ms']), _slug(meta['session_key'])
+    ))
+
+    with open(f"{base}.folded", 'w', encoding='utf-8') as f:
+        for stack, count in sampler.stacks.items():
+            f.write(";".join(f"{name} ({os.path.basename(file)}:{line})" for name, file, line in stack))
+            f.write(f" {count}\n")
+
+    frames, frame_ids, samples, weights = [], {}, [], []
+    interval_ms = sampler.interval * 1000
+    for stack, count in sampler.stacks.items():
+        ids = []
+        for frame in stack:
+            if frame not in frame_ids:
+                frame_ids[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            ids.append(frame_ids[frame])
+        samples.append(ids)
+        weights.append(count * interval_ms)
+    speedscope = {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': f"{meta['method']} {meta['path']}",
+        'exporter': 'travel-assistant-api',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': meta['route'],
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': meta['duration_ms'],
+            'samples': samples,
+            'weights': weights
+        }],
+        'metadata': meta
+    }
+    with open(f"{base}.speedscope.json", 'w', encoding='utf-8') as f:
+        json.dump(speedscope, f, separators=(',', ':'))
+
+    profiles = sorted(p for p in os.listdir(directory) if p.endswith('.folded'))
+    for old in profiles[:max(0, len(profiles) - max_files)]:
+        for suffix in ('.folded', '.speedscope.json'):
+            try:
+                os.remove(os.path.join(directory, old[:-len('.folded')] + suffix))
+            except OSError:
+                pass
+
+
+def init_profiling(app):
+    sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    secret = os.getenv("PROFILE_SECRET")
+    if sample_rate <= 0 and not secret:
+        return
+
+    directory = os.getenv("PROFILE_DIR", "/tmp/travel-assistant-profiles")
+    max_files = int(os.getenv("PROFILE_MAX_FILES", "200"))
+    interval = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+    write_lock = threading.Lock()
+
+    @app.before_request
+    def start_profiler():
+        token = request.headers.get(PROFILE_HEADER)
+        requested = bool(secret and token and _valid_token(secret, token, request.path))
+        if not requested and random.random() >= sample_rate:
+            return
+        sampler = RequestSampler(threading.get_ident(), interval)
+        g._profiler = (sampler, time.perf_counter())
+        sampler.start()
+
+    @app.teardown_request
+    def stop_profiler(error=None):
+        profiler = g.pop('_profiler', None)
+        if not profiler:
+            return
+        sampler, started = profiler
+        sampler.stop()
+        meta = {
+            'method': request.method,
+            'path': request.path,
+            'route': request.endpoint or request.path,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'session_key': _session_key(),
+            'samples': sum(sampler.stacks.values()),
+            'error': str(error) if error else None
+        }
+        try:
+            with write_lock:
+                _write_profile(directory, max_files, sampler, meta)
+        except Exception as e:
+            print(f"Failed to write profile for {request.path}: {e}")
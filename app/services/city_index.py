@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import math
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+CITY_DATA_PATH = os.getenv("CITY_DATA_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cities.json"))
+GRID_CELL_DEGREES = 0.5
+MAX_ALIAS_WORDS = 4
+COUNTRY_NAMES = ('india', 'bharat')
+
+_index = {'cities': {}, 'aliases': {}, 'states': set(), 'grid': {}}
+_index_lock = threading.Lock()
+_loaded = False
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9, ]+", " ", (text or '').lower()).strip()
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lon / GRID_CELL_DEGREES))
+
+
+def _contains(polygon: List[List[float]], lat: float, lon: float) -> bool:
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lon_i > lon) != (lon_j > lon) and lat < (lat_j - lat_i) * (lon - lon_i) / (lon_j - lon_i) + lat_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _polygon_area(polygon: List[List[float]]) -> float:
+    return abs(sum(
+        polygon[i - 1][1] * polygon[i][0] - polygon[i][1] * polygon[i - 1][0]
+        for i in range(len(polygon))
+    )) / 2
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+class CityIndex:
+    """Offline city lookup over the bundled centroid/polygon dataset, backed by a uniform lat/lon grid"""
+
+    @staticmethod
+    def load(path: Optional[str] = None):
+        global _loaded
+        with _index_lock:
+            if _loaded and not path:
+                return
+            with open(path or CITY_DATA_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+
+            cities, aliases, states, grid = {}, {}, set(), {}
+            for city in data.get('cities', []):
+                key = city['key']
+                city = {**city, 'area': _polygon_area(city['polygon'])}
+                cities[key] = city
+                for alias in [key, city['name']] + city.get('aliases', []):
+                    aliases[_normalize(alias)] = key
+                if city.get('state'):
+                    states.add(_normalize(city['state']))
+
+                lats = [p[0] for p in city['polygon']]
+                lons = [p[1] for p in city['polygon']]
+                (r0, c0), (r1, c1) = _cell(min(lats), min(lons)), _cell(max(lats), max(lons))
+                for r in range(r0, r1 + 1):
+                    for c in range(c0, c1 + 1):
+                        grid.setdefault((r, c), []).append(key)
+
+            _index.update({'cities': cities, 'aliases': aliases, 'states': states, 'grid': grid})
+            _loaded = True
+        CityIndex.resolve_name.cache_clear()
+
+    @staticmethod
+    def _ensure_loaded():
+        if not _loaded:
+            CityIndex.load()
+
+    @staticmethod
+    def get(key: Optional[str]) -> Optional[Dict]:
+        CityIndex._ensure_loaded()
+        return _index['cities'].get(key) if key else None
+
+    @staticmethod
+    def locate(lat: float, lon: float) -> Optional[str]:
+        """Key of the smallest city polygon containing the point, or None"""
+        CityIndex._ensure_loaded()
+        matches = [
+            _index['cities'][key] for key in _index['grid'].get(_cell(lat, lon), [])
+            if _contains(_index['cities'][key]['polygon'], lat, lon)
+        ]
+        if not matches:
+            return None
+        return min(matches, key=lambda c: c['area'])['key']
+
+    @staticmethod
+    def nearest(lat: float, lon: float, max_km: float = 50.0) -> Optional[str]:
+        """Key of the closest city centroid within max_km, searching the surrounding grid cells"""
+        CityIndex._ensure_loaded()
+        row, col = _cell(lat, lon)
+        reach = int(math.ceil(max_km / (GRID_CELL_DEGREES * 111.0)))
+        best, best_km = None, max_km
+        seen = set()
+        for r in range(row - reach, row + reach + 1):
+            for c in range(col - reach, col + reach + 1):
+                for key in _index['grid'].get((r, c), []):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    c_lat, c_lon = _index['cities'][key]['centroid']
+                    distance = _haversine_km(lat, lon, c_lat, c_lon)
+                    if distance <= best_km:
+                        best, best_km = key, distance
+        return best
+
+    @staticmethod
+    def _partial_match(words: List[str]) -> Optional[str]:
+        """City of the longest alias appearing inside a part, e.g. 'salt lake' in 'salt lake city'"""
+        aliases = _index['aliases']
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size, -1, -1):
+                candidate = " ".join(words[start:start + size])
+                if candidate in aliases:
+                    return aliases[candidate]
+        return None
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def resolve_name(text: str) -> Optional[str]:
+        """Map free text like 'Koregaon Park, Pune' or 'Bombay' to a canonical city key.
+
+        Every comma-separated part must be accounted for: a whole-part alias
+        names a city, and a part may also be a known state or the country.
+        An alias found only inside a part is accepted when another part names
+        the same city or its state. Anything unrecognised, or parts that
+        disagree ('Dwarka, Gujarat'), return None so the caller geocodes.
+        """
+        CityIndex._ensure_loaded()
+        aliases, states = _index['aliases'], _index['states']
+        exact, partial, named_states = set(), set(), set()
+        for part in _normalize(text).split(','):
+            words = [w for w in part.split() if not w.isdigit()]
+            if not words:
+                continue
+            joined = " ".join(words)
+            if joined in aliases:
+                exact.add(aliases[joined])
+                if joined in states:
+                    named_states.add(joined)
+            elif joined in states:
+                named_states.add(joined)
+            elif joined in COUNTRY_NAMES:
+                continue
+            else:
+                city = CityIndex._partial_match(words)
+                if not city:
+                    return None
+                partial.add(city)
+
+        if len(exact) > 1:
+            return None
+        if exact:
+            key = next(iter(exact))
+        elif len(partial) == 1 and named_states:
+            key = next(iter(partial))
+        else:
+            return None
+        if partial and partial != {key}:
+            return None
+        state = _normalize(_index['cities'][key].get('state', ''))
+        if any(s != state for s in named_states):
+            return None
+        return key
+
+    @staticmethod
+    def resolve(text: Optional[str] = None, details: Optional[Dict] = None) -> Optional[str]:
+        """Resolve a place by name first, then by the coordinates of a geocoding result"""
+        key = CityIndex.resolve_name(text) if text else None
+        if key or not details:
+            return key
+        try:
+            lat, lon = float(details['lat']), float(details['lon'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return CityIndex.locate(lat, lon) or CityIndex.nearest(lat, lon, max_km=25.0)
+
+    @staticmethod
+    def canonical_name(text: str) -> str:
+        """Canonical display name for a place, or the input unchanged if unknown"""
+        city = CityIndex.get(CityIndex.resolve_name(text or ''))
+        return city['name'] if city else text
@@ -0,0 +1,110 @@
+import os
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# Straight-line distance understates road distance; typical Indian city/highway detour factor
+ROAD_FACTOR = float(os.getenv("FARE_ROAD_FACTOR", "1.3"))
+
+LOCAL_VEHICLES = ('Auto', 'Go', 'Premier')
+OUTSTATION_VEHICLES = ('Outstation Sedan', 'Outstation SUV')
+
+# INR fares: base + per_km * km + per_min * minutes, floored at min_fare.
+# avg_speed_kmh drives the time estimate for that vehicle class.
+DEFAULT_FARE_TABLE = {
+    'default': {
+        'Auto': {'base': 25, 'per_km': 14, 'per_min': 1.0, 'min_fare': 30, 'avg_speed_kmh': 20},
+        'Go': {'base': 50, 'per_km': 15, 'per_min': 1.5, 'min_fare': 80, 'avg_speed_kmh': 24},
+        'Premier': {'base': 70, 'per_km': 18, 'per_min': 2.0, 'min_fare': 110, 'avg_speed_kmh': 24},
+        'Outstation Sedan': {'base': 300, 'per_km': 12, 'per_min': 0.0, 'min_fare': 1500, 'avg_speed_kmh': 55},
+        'Outstation SUV': {'base': 400, 'per_km': 16, 'per_min': 0.0, 'min_fare': 2000, 'avg_speed_kmh': 50}
+    },
+    'mumbai': {
+        'Auto': {'base': 26, 'per_km': 17, 'per_min': 1.0, 'min_fare': 26, 'avg_speed_kmh': 16},
+        'Go': {'base': 60, 'per_km': 17, 'per_min': 1.5, 'min_fare': 90, 'avg_speed_kmh': 18},
+        'Premier': {'base': 80, 'per_km': 20, 'per_min': 2.0, 'min_fare': 120, 'avg_speed_kmh': 18}
+    },
+    'pune': {
+        'Auto': {'base': 25, 'per_km': 15, 'per_min': 0.5, 'min_fare': 25, 'avg_speed_kmh': 20},
+        'Go': {'base': 50, 'per_km': 14, 'per_min': 1.5, 'min_fare': 75, 'avg_speed_kmh': 22},
+        'Premier': {'base': 70, 'per_km': 17, 'per_min': 2.0, 'min_fare': 100, 'avg_speed_kmh': 22}
+    },
+    'delhi': {
+        'Auto': {'base': 30, 'per_km': 11, 'per_min': 1.0, 'min_fare': 30, 'avg_speed_kmh': 20},
+        'Go': {'base': 55, 'per_km': 14, 'per_min': 1.5, 'min_fare': 80, 'avg_speed_kmh': 22},
+        'Premier': {'base': 75, 'per_km': 17, 'per_min': 2.0, 'min_fare': 110, 'avg_speed_kmh': 22}
+    },
+    'bengaluru': {
+        'Auto': {'base': 30, 'per_km': 15, 'per_min': 1.0, 'min_fare': 30, 'avg_speed_kmh': 15},
+        'Go': {'base': 60, 'per_km': 16, 'per_min': 1.5, 'min_fare': 90, 'avg_speed_kmh': 17},
+        'Premier': {'base': 80, 'per_km': 19, 'per_min': 2.0, 'min_fare': 120, 'avg_speed_kmh': 17}
+    }
+}
+
+
+def _load_fare_table() -> Dict:
+    table = {city: dict(vehicles) for city, vehicles in DEFAULT_FARE_TABLE.items()}
+    path = os.getenv("FARE_TABLE_PATH")
+    if path:
+        try:
+            with open(path, encoding='utf-8') as f:
+                for city, vehicles in json.load(f).items():
+                    table.setdefault(city.lower(), {}).update(vehicles)
+        except Exception as e:
+            print(f"Failed to load fare table '{path}': {e}")
+    return table
+
+
+class FareEstimator:
+    fare_table = _load_fare_table()
+
+    @staticmethod
+    def distance_matrix(origins: Sequence[Tuple[float, float]], destinations: Sequence[Tuple[float, float]]) -> np.ndarray:
+        """Haversine distance in km between every origin and destination (lat, lon) pair, shape (N, M)"""
+        o = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+        d = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+        lat1, lon1 = o[:, 0:1], o[:, 1:2]
+        lat2, lon2 = d[:, 0], d[:, 1]
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @staticmethod
+    def _rates(city: Optional[str], vehicle_types: Sequence[str]) -> Dict[str, np.ndarray]:
+        default = FareEstimator.fare_table['default']
+        city_rates = FareEstimator.fare_table.get((city or '').lower().split(',')[0].strip(), {})
+        rows = [{**default.get(v, {}), **city_rates.get(v, {})} for v in vehicle_types]
+        missing = [v for v, row in zip(vehicle_types, rows) if not row]
+        if missing:
+            raise ValueError(f"No fare configured for vehicle type(s): {', '.join(missing)}")
+        return {field: np.array([row[field] for row in rows], dtype=float)
+                for field in ('base', 'per_km', 'per_min', 'min_fare', 'avg_speed_kmh')}
+
+    @staticmethod
+    def estimate_matrix(origins: Sequence[Tuple[float, float]], destinations: Sequence[Tuple[float, float]],
+                        vehicle_types: Sequence[str], city: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Road distance (N, M), and time/fare per vehicle type (N, M, V) for all origin/destination pairs"""
+        rates = FareEstimator._rates(city, vehicle_types)
+        road_km = FareEstimator.distance_matrix(origins, destinations) * ROAD_FACTOR
+        km = road_km[..., np.newaxis]
+        minutes = km / rates['avg_speed_kmh'] * 60
+        fares = np.maximum(rates['base'] + rates['per_km'] * km + rates['per_min'] * minutes, rates['min_fare'])
+        return {'distance_km': road_km, 'duration_min': minutes, 'fare_inr': fares}
+
+    @staticmethod
+    def estimate(origin: Tuple[float, float], destination: Tuple[float, float],
+                 vehicle_types: Sequence[str] = LOCAL_VEHICLES, city: Optional[str] = None) -> Dict:
+        result = FareEstimator.estimate_matrix([origin], [destination], vehicle_types, city)
+        options: List[Dict] = []
+        for i, vehicle in enumerate(vehicle_types):
+            options.append({
+                'vehicle_type': vehicle,
+                'estimated_fare_inr': int(round(float(result['fare_inr'][0, 0, i]), -1)),
+                'estimated_duration_min': int(round(float(result['duration_min'][0, 0, i])))
+            })
+        return {
+            'distance_km': round(float(result['distance_km'][0, 0]), 1),
+            'city': city,
+            'options': options,
+            'source': 'local_estimate'
+        }
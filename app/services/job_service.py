@@ -0,0 +1,114 @@
+import os
+import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "64"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+# In-memory storage for jobs
+jobs_db = {}
+_job_events = {}
+_jobs_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="travel-job")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobService:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    @staticmethod
+    def submit(kind: str, func: Callable, *args) -> Dict[str, Any]:
+        """Queue func(*args) on the worker pool and return the job record"""
+        JobService.purge_expired()
+        with _jobs_lock:
+            active = sum(1 for j in jobs_db.values() if j['status'] in (JobService.PENDING, JobService.RUNNING))
+            if active >= JOB_QUEUE_LIMIT:
+                raise JobQueueFull(f"Too many pending jobs ({active}), try again later")
+
+            job_id = str(uuid.uuid4())
+            job = {
+                'job_id': job_id,
+                'kind': kind,
+                'status': JobService.PENDING,
+                'result': None,
+                'error': None,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'expires_at': None
+            }
+            jobs_db[job_id] = job
+            _job_events[job_id] = threading.Event()
+            snapshot = dict(job)
+
+        _executor.submit(JobService._run, job_id, func, args)
+        return snapshot
+
+    @staticmethod
+    def _run(job_id: str, func: Callable, args: tuple):
+        JobService._update(job_id, status=JobService.RUNNING, started_at=datetime.now().isoformat())
+        try:
+            result = func(*args)
+            # Search helpers report failures as {'error': ...} instead of raising
+            if isinstance(result, dict) and result.get('error'):
+                updates = {'status': JobService.FAILED, 'error': str(result['error']), 'result': result}
+            else:
+                updates = {'status': JobService.COMPLETED, 'result': result}
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            updates = {'status': JobService.FAILED, 'error': str(e)}
+        updates['finished_at'] = datetime.now().isoformat()
+        updates['_expires'] = time.time() + JOB_RESULT_TTL
+        updates['expires_at'] = datetime.fromtimestamp(updates['_expires']).isoformat()
+        JobService._update(job_id, **updates)
+
+        event = _job_events.get(job_id)
+        if event:
+            event.set()
+
+    @staticmethod
+    def _update(job_id: str, **updates):
+        with _jobs_lock:
+            if job_id in jobs_db:
+                jobs_db[job_id].update(updates)
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+        JobService.purge_expired()
+        with _jobs_lock:
+            job = jobs_db.get(job_id)
+            if not job:
+                return None
+            return {k: v for k, v in job.items() if not k.startswith('_')}
+
+    @staticmethod
+    def wait(job_id: str, timeout: float) -> bool:
+        """Block until the job finishes or timeout elapses; True if finished"""
+        event = _job_events.get(job_id)
+        if not event:
+            return True
+        return event.wait(timeout)
+
+    @staticmethod
+    def is_finished(job: Dict[str, Any]) -> bool:
+        return job['status'] in (JobService.COMPLETED, JobService.FAILED)
+
+    @staticmethod
+    def purge_expired():
+        now = time.time()
+        with _jobs_lock:
+            expired = [k for k, j in jobs_db.items() if j.get('_expires') and j['_expires'] <= now]
+            for job_id in expired:
+                jobs_db.pop(job_id, None)
+                _job_events.pop(job_id, None)
@@ -0,0 +1,94 @@
+import os
+import gzip
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+ARTIFACT_VERSION = 1
+DEFAULT_ARTIFACT_PATH = os.getenv("PRECOMPUTED_ARTIFACT", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "precomputed.json.gz"))
+
+_store = {'guides': {}, 'itineraries': {}, 'routes': {}}
+_store_meta = {}
+_store_lock = threading.Lock()
+
+
+def _key(*parts) -> str:
+    return "|".join(str(p or '').lower().strip() for p in parts)
+
+
+class PrecomputedStore:
+    """Read-only cache of guides, itineraries and route searches built offline by app.precompute"""
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> bool:
+        path = path or DEFAULT_ARTIFACT_PATH
+        if not os.path.exists(path):
+            return False
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                artifact = json.load(f)
+            if artifact.get('version') != ARTIFACT_VERSION:
+                print(f"Ignoring precomputed artifact '{path}': version {artifact.get('version')} != {ARTIFACT_VERSION}")
+                return False
+            with _store_lock:
+                for section in _store:
+                    _store[section] = artifact.get(section, {})
+                _store_meta.clear()
+                _store_meta.update({'path': path, 'generated_at': artifact.get('generated_at')})
+            print(f"Loaded precomputed artifact '{path}' ({PrecomputedStore.size()} entries)")
+            return True
+        except Exception as e:
+            print(f"Failed to load precomputed artifact '{path}': {e}")
+            return False
+
+    @staticmethod
+    def size() -> int:
+        return sum(len(v) for v in _store.values())
+
+    @staticmethod
+    def get_guide(city: str) -> Optional[Dict]:
+        return _store['guides'].get(_key(city))
+
+    @staticmethod
+    def get_itinerary(departure: str, destination: str, days: int) -> Optional[Dict]:
+        return _store['itineraries'].get(_key(departure, destination, days))
+
+    @staticmethod
+    def get_route(mode: str, departure: str, destination: str, date: Optional[str] = None) -> Optional[Dict]:
+        return _store['routes'].get(_key(mode, departure, destination, date))
+
+
+class ArtifactBuilder:
+    """Collects precomputed entries and writes them as a versioned gzip JSON artifact"""
+
+    def __init__(self):
+        self.sections = {'guides': {}, 'itineraries': {}, 'routes': {}}
+        self.lock = threading.Lock()
+
+    def add_guide(self, city: str, guide: Dict):
+        with self.lock:
+            self.sections['guides'][_key(city)] = guide
+
+    def add_itinerary(self, departure: str, destination: str, days: int, itinerary: Dict):
+        with self.lock:
+            self.sections['itineraries'][_key(departure, destination, days)] = itinerary
+
+    def add_route(self, mode: str, departure: str, destination: str, date: Optional[str], result: Dict):
+        with self.lock:
+            self.sections['routes'][_key(mode, departure, destination, date)] = result
+
+    def write(self, path: str) -> Dict[str, Any]:
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'generated_at': datetime.now().isoformat(),
+            **self.sections
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(artifact, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return {section: len(entries) for section, entries in self.sections.items()}
@@ -0,0 +1,143 @@
+import os
+import json
+import mmap
+import time
+import zlib
+import hashlib
+import threading
+from typing import Any, Callable, Dict
+
+# Settings are read from the environment on each call so the mode can be switched at runtime
+def _mode() -> str:
+    return os.getenv("PROVIDER_REPLAY_MODE", "off").lower()
+
+
+def _cassette_dir() -> str:
+    return os.getenv("PROVIDER_CASSETTE_DIR", "cassettes")
+
+
+def _replay_latency() -> bool:
+    return os.getenv("PROVIDER_REPLAY_LATENCY", "false").lower() in ('1', 'true', 'yes')
+
+
+# Cassette state keyed by (mode, data path): index {key: (offset, length, latency_ms)} and the open data file/mmap
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+class ReplayMiss(Exception):
+    pass
+
+
+class _ReplayClient:
+    """Truthy stand-in for a provider client that is never called while replaying"""
+
+    def __bool__(self):
+        return True
+
+
+REPLAY_CLIENT = _ReplayClient()
+
+
+class ProviderReplay:
+    """Record/replay of upstream provider calls (Groq, Tavily, Serper, Nominatim).
+
+    Each provider gets <dir>/<provider>.dat holding zlib-compressed JSON
+    records and <dir>/<provider>.idx, a JSON-lines index of
+    key -> offset, length and original latency. Replay reads records
+    straight out of a read-only mmap of the data file.
+    """
+
+    @staticmethod
+    def recording() -> bool:
+        return _mode() == 'record'
+
+    @staticmethod
+    def replaying() -> bool:
+        return _mode() == 'replay'
+
+    @staticmethod
+    def _key(request: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _paths(provider: str):
+        base = os.path.join(_cassette_dir(), provider)
+        return f"{base}.dat", f"{base}.idx"
+
+    @staticmethod
+    def _cassette(provider: str) -> Dict:
+        data_path, index_path = ProviderReplay._paths(provider)
+        cache_key = (_mode(), os.path.abspath(data_path))
+        cassette = _cassettes.get(cache_key)
+        if cassette:
+            return cassette
+        with _cassettes_lock:
+            if cache_key in _cassettes:
+                return _cassettes[cache_key]
+            index = {}
+            if os.path.exists(index_path):
+                with open(index_path, encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            index[entry['k']] = (entry['o'], entry['n'], entry['ms'])
+
+            cassette = {'index': index, 'lock': threading.Lock(), 'mmap': None}
+            if ProviderReplay.recording():
+                os.makedirs(os.path.dirname(data_path) or '.', exist_ok=True)
+                cassette['data'] = open(data_path, 'ab')
+                cassette['idx'] = open(index_path, 'a', encoding='utf-8')
+            elif index and os.path.getsize(data_path) > 0:
+                with open(data_path, 'rb') as f:
+                    cassette['mmap'] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _cassettes[cache_key] = cassette
+            return cassette
+
+    @staticmethod
+    def _record(provider: str, key: str, request: Dict, response: Any, latency_ms: float):
+        cassette = ProviderReplay._cassette(provider)
+        with cassette['lock']:
+            if key in cassette['index']:
+                return
+            blob = zlib.compress(json.dumps({'request': request, 'response': response}, separators=(',', ':')).encode())
+            data = cassette['data']
+            offset = data.seek(0, os.SEEK_END)
+            data.write(blob)
+            data.flush()
+            cassette['idx'].write(json.dumps({'k': key, 'o': offset, 'n': len(blob), 'ms': round(latency_ms, 1)}) + "\n")
+            cassette['idx'].flush()
+            cassette['index'][key] = (offset, len(blob), latency_ms)
+
+    @staticmethod
+    def _replay(provider: str, key: str) -> Any:
+        cassette = ProviderReplay._cassette(provider)
+        entry = cassette['index'].get(key)
+        if not entry or cassette['mmap'] is None:
+            raise ReplayMiss(f"No recorded {provider} response for this request")
+        offset, length, latency_ms = entry
+        record = json.loads(zlib.decompress(cassette['mmap'][offset:offset + length]))
+        if _replay_latency():
+            time.sleep(latency_ms / 1000)
+        return record['response']
+
+    @staticmethod
+    def call(provider: str, request: Dict[str, Any], func: Callable[[], Any]) -> Any:
+        """Run func() live, record its result, or serve the recorded result, depending on the mode.
+
+        func must return a JSON-serializable value. Exceptions are never recorded.
+        """
+        if _mode() not in ('record', 'replay'):
+            return func()
+        key = ProviderReplay._key({'provider': provider, **request})
+        if ProviderReplay.replaying():
+            return ProviderReplay._replay(provider, key)
+
+        started = time.perf_counter()
+        response = func()
+        latency_ms = (time.perf_counter() - started) * 1000
+        try:
+            ProviderReplay._record(provider, key, request, response, latency_ms)
+        except Exception as e:
+            print(f"Failed to record {provider} response: {e}")
+        return response
@@ -0,0 +1,151 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+RESULT_STORE_TTL = int(os.getenv("RESULT_STORE_TTL", "1800"))
+RESULT_STORE_MAX_QUERIES = int(os.getenv("RESULT_STORE_MAX_QUERIES", "500"))
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+RECORD_FIELDS = ('provider', 'name', 'price', 'departure_time', 'arrival_time', 'rating', 'link')
+NUMERIC_FIELDS = ('price', 'rating')
+QUERY_PARAMS = ('min_price', 'max_price', 'min_rating', 'provider', 'sort', 'limit', 'offset')
+
+# In-memory columnar storage: result_id -> {'columns': {field: ndarray}, 'expires': float}
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"\d+(?:\.\d+)?", str(value or '').replace(',', ''))
+    return float(match.group()) if match else np.nan
+
+
+class ResultStore:
+    @staticmethod
+    def put(query: str, records: List[Dict]) -> str:
+        """Store typed search records column-wise and return the result_id used to query them"""
+        result_id = hashlib.sha1(query.encode()).hexdigest()[:16]
+        columns = {}
+        for field in RECORD_FIELDS:
+            values = [r.get(field) for r in records]
+            if field in NUMERIC_FIELDS:
+                columns[field] = np.array([_to_float(v) for v in values], dtype=float)
+            else:
+                columns[field] = np.array([str(v) if v is not None else '' for v in values], dtype=object)
+
+        with _results_lock:
+            _results[result_id] = {'columns': columns, 'expires': time.time() + RESULT_STORE_TTL}
+            _results.move_to_end(result_id)
+            while len(_results) > RESULT_STORE_MAX_QUERIES:
+                _results.popitem(last=False)
+        return result_id
+
+    @staticmethod
+    def _columns(result_id: str) -> Optional[Dict[str, np.ndarray]]:
+        with _results_lock:
+            entry = _results.get(result_id)
+            if not entry:
+                return None
+            if entry['expires'] <= time.time():
+                del _results[result_id]
+                return None
+            return entry['columns']
+
+    @staticmethod
+    def parse_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and type the filter/sort/pagination params; raises ValueError on bad input.
+
+        Supported params: min_price, max_price, min_rating, provider,
+        sort (field name, prefix '-' for descending), limit, offset.
+        """
+        parsed = {}
+        for name in ('min_price', 'max_price', 'min_rating'):
+            value = params.get(name)
+            if value in (None, ''):
+                continue
+            try:
+                parsed[name] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number")
+            if not np.isfinite(parsed[name]):
+                raise ValueError(f"{name} must be a number")
+        for name, default in (('offset', 0), ('limit', DEFAULT_PAGE_SIZE)):
+            value = params.get(name)
+            try:
+                parsed[name] = int(value) if value not in (None, '') else default
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be an integer")
+        parsed['offset'] = max(0, parsed['offset'])
+        parsed['limit'] = min(MAX_PAGE_SIZE, max(1, parsed['limit']))
+        if params.get('provider'):
+            parsed['provider'] = str(params['provider']).lower()
+        sort = params.get('sort')
+        if sort:
+            field = sort.lstrip('-')
+            if field not in RECORD_FIELDS:
+                raise ValueError(f"Cannot sort by '{field}'")
+            parsed['sort'] = (field, sort.startswith('-'))
+        return parsed
+
+    @staticmethod
+    def query(result_id: str, params: Dict[str, Any]) -> Optional[Dict]:
+        """Filter, sort and paginate stored records (see parse_params for the supported params)"""
+        params = ResultStore.parse_params(params)
+        columns = ResultStore._columns(result_id)
+        if columns is None:
+            return None
+
+        mask = np.ones(len(columns['price']), dtype=bool)
+        if 'min_price' in params:
+            mask &= columns['price'] >= params['min_price']
+        if 'max_price' in params:
+            mask &= columns['price'] <= params['max_price']
+        if 'min_rating' in params:
+            mask &= columns['rating'] >= params['min_rating']
+        if 'provider' in params:
+            mask &= np.array([params['provider'] in p.lower() for p in columns['provider']], dtype=bool)
+        indices = np.flatnonzero(mask)
+
+        if 'sort' in params:
+            field, descending = params['sort']
+            values = columns[field][indices]
+            if field in NUMERIC_FIELDS:
+                # NaN (unknown) always sorts last
+                order = np.argsort(-values if descending else values, kind='stable')
+            else:
+                present = values != ''
+                order = np.argsort(values[present].astype(str), kind='stable')
+                if descending:
+                    order = order[::-1]
+                order = np.concatenate([np.flatnonzero(present)[order], np.flatnonzero(~present)])
+            indices = indices[order]
+
+        offset, limit = params['offset'], params['limit']
+        page = indices[offset:offset + limit]
+
+        records = []
+        for i in page:
+            record = {}
+            for field in RECORD_FIELDS:
+                value = columns[field][i]
+                if field in NUMERIC_FIELDS:
+                    record[field] = None if np.isnan(value) else float(value)
+                else:
+                    record[field] = value or None
+            records.append(record)
+
+        return {
+            'result_id': result_id,
+            'total': int(len(indices)),
+            'offset': offset,
+            'limit': limit,
+            'records': records
+        }
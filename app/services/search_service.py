@@ -1,11 +1,18 @@
 import os
 import json
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
 from datetime import datetime
 from typing import Dict, List, Any, Optional, TypedDict
 import folium
 import base64
+from app.services.precompute_service import PrecomputedStore
+from app.services.fare_service import FareEstimator, LOCAL_VEHICLES, OUTSTATION_VEHICLES
+from app.services.city_index import CityIndex
+from app.services.replay_service import ProviderReplay, REPLAY_CLIENT
+from app.services.result_store import ResultStore
 
 # Groq API import
 try:
@@ -52,9 +59,13 @@ class LocationService:
         try:
             url = f"https://nominatim.openstreetmap.org/search?q={quote_plus(address)}&format=json&addressdetails=1"
             headers = {'User-Agent': 'TravelBot/1.0'}
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+
+            def fetch():
+                response = requests.get(url, headers=headers, timeout=10)
+                response.raise_for_status()
+                return response.json()
+
+            data = ProviderReplay.call('nominatim', {'q': address}, fetch)
             if data:
                 return data[0]
             return None
@@ -91,9 +102,13 @@ class DeepLinkGenerator:
         'bengaluru': ('BMTC', 'https://mybmtc.karnataka.gov.in/')
     }
 
+    @staticmethod
+    def _city_key(city: str) -> str:
+        return CityIndex.resolve_name(city) or city.lower().split(',')[0].strip()
+
     @staticmethod
     def for_local_buses(city: str) -> Dict[str, str]:
-        city_lower = city.lower().split(',')[0].strip()
+        city_lower = DeepLinkGenerator._city_key(city)
         if city_lower in DeepLinkGenerator.LOCAL_BUS_SITES:
             name, url = DeepLinkGenerator.LOCAL_BUS_SITES[city_lower]
             return {name: url}
@@ -101,8 +116,8 @@ class DeepLinkGenerator:
 
     @staticmethod
     def for_flights(dep_city: str, dest_city: str, date: datetime) -> Dict[str, str]:
-        dep_code = DeepLinkGenerator.IATA_CODES.get(dep_city.lower(), dep_city)
-        dest_code = DeepLinkGenerator.IATA_CODES.get(dest_city.lower(), dest_city)
+        dep_code = DeepLinkGenerator.IATA_CODES.get(DeepLinkGenerator._city_key(dep_city), dep_city)
+        dest_code = DeepLinkGenerator.IATA_CODES.get(DeepLinkGenerator._city_key(dest_city), dest_city)
         date_str = date.strftime("%y%m%d")
         links = {
             "MakeMyTrip": f"https://www.makemytrip.com/flight/search?itinerary={dep_code}-{dest_code}-{date_str}",
@@ -138,8 +153,8 @@ class DeepLinkGenerator:
 
     @staticmethod
     def for_trains(dep_city: str, dest_city: str, date: datetime) -> Dict[str, str]:
-        dep_code = DeepLinkGenerator.STATION_CODES.get(dep_city.lower(), dep_city)
-        dest_code = DeepLinkGenerator.STATION_CODES.get(dest_city.lower(), dest_city)
+        dep_code = DeepLinkGenerator.STATION_CODES.get(DeepLinkGenerator._city_key(dep_city), dep_city)
+        dest_code = DeepLinkGenerator.STATION_CODES.get(DeepLinkGenerator._city_key(dest_city), dest_city)
         date_str = date.strftime("%d-%m-%Y")
         links = {
             "RailYatri": f"https://www.railyatri.in/train-ticket/from-{dep_code}/to-{dest_code}?date={date_str}"
@@ -166,23 +181,38 @@ class GroqLLM:
                 self.client = None
         else:
             self.client = None
+        if self.client is None and ProviderReplay.replaying():
+            self.client = REPLAY_CLIENT
             
     def invoke(self, prompt: str) -> str:
         if not self.client:
             return "Groq API not available. Please check your API key."
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.model_name,
-            )
-            response = chat_completion.choices[0].message.content
+            def complete():
+                chat_completion = self.client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=self.model_name,
+                )
+                return chat_completion.choices[0].message.content
+
+            response = ProviderReplay.call('groq', {'model': self.model_name, 'prompt': prompt}, complete)
             return response if response else "Sorry, I couldn't generate a proper response."
         except Exception as e:
             print(f"Groq API Error: {e}")
             return f"Error generating response: {e}"
 
+MULTICITY_MAX_WORKERS = int(os.getenv("MULTICITY_MAX_WORKERS", "12"))
+MULTICITY_MODES = ('flights', 'trains', 'buses')
+RECORDS_MARKER = "---RECORDS---"
+RECORDS_INSTRUCTION = f"""
+
+After your answer, output a line containing only {RECORDS_MARKER} followed by a JSON array of the options you listed.
+Each item must be an object with keys: provider, name, price (number in INR or null), departure_time (HH:MM or null),
+arrival_time (HH:MM or null), rating (number or null), link (URL or null). Output [] if there are none."""
+
 class EnhancedSearchTools:
-    def __init__(self):
+    def __init__(self, use_precomputed: bool = True):
+        self.use_precomputed = use_precomputed
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
         self.serper_api_key = os.getenv("SERPER_API_KEY")
@@ -202,18 +232,23 @@ class EnhancedSearchTools:
             print(f"Failed during Search Tools setup: {e}")
 
     def setup_llm(self):
-        if self.groq_api_key and GROQ_AVAILABLE:
+        if (self.groq_api_key and GROQ_AVAILABLE) or ProviderReplay.replaying():
             self.llm = GroqLLM(self.groq_api_key)
 
     def setup_search_tools(self):
         if self.tavily_api_key and TAVILY_AVAILABLE:
             self.tavily_client = TavilyClient(api_key=self.tavily_api_key)
+        elif ProviderReplay.replaying():
+            self.tavily_client = REPLAY_CLIENT
     
     def search_web(self, query: str) -> str:
         results = []
         try:
             if self.tavily_client:
-                tavily_results = self.tavily_client.search(query, max_results=3)
+                tavily_results = ProviderReplay.call(
+                    'tavily', {'query': query, 'max_results': 3},
+                    lambda: self.tavily_client.search(query, max_results=3)
+                )
                 for result in tavily_results.get('results', []):
                     results.append({
                         'title': result.get('title', ''), 
@@ -222,7 +257,7 @@ class EnhancedSearchTools:
                         'source': 'Tavily'
                     })
             
-            if self.serper_api_key and len(results) < 3:
+            if (self.serper_api_key or ProviderReplay.replaying()) and len(results) < 3:
                 results.extend(self.serper_search(query))
             
             if self.duckduckgo_search and len(results) < 2:
@@ -249,9 +284,13 @@ class EnhancedSearchTools:
             url = "https://google.serper.dev/search"
             payload = json.dumps({"q": query, "num": 5, "gl": "in", "hl": "en"})
             headers = {'X-API-KEY': self.serper_api_key, 'Content-Type': 'application/json'}
-            response = requests.post(url, headers=headers, data=payload, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+
+            def fetch():
+                response = requests.post(url, headers=headers, data=payload, timeout=10)
+                response.raise_for_status()
+                return response.json()
+
+            data = ProviderReplay.call('serper', {'payload': payload}, fetch)
             return [{
                 'title': i.get('title', ''), 
                 'content': i.get('snippet', ''), 
@@ -268,22 +307,48 @@ class EnhancedSearchTools:
         prompt = f"Task: {instruction}\n\nSearch Results:\n{results[:3500]}\n\nResponse:"
         return self.llm.invoke(prompt)
     
+    @staticmethod
+    def _extract_records(processed_data: str):
+        """Split the LLM answer into its prose part and the typed records listed after RECORDS_MARKER"""
+        text, _, tail = processed_data.partition(RECORDS_MARKER)
+        records = []
+        start, end = tail.find('['), tail.rfind(']')
+        if start != -1 and end > start:
+            try:
+                records = [r for r in json.loads(tail[start:end + 1]) if isinstance(r, dict)]
+            except ValueError as e:
+                print(f"Could not parse search records: {e}")
+        return text.strip(), records
+
     def _execute_search(self, query: str, instruction: str) -> Dict:
         search_results = self.search_web(query)
         processed_data = "AI processing not available."
+        records = []
         if self.llm:
             try:
-                processed_data = self.process_search_with_llm(search_results, instruction)
+                processed_data = self.process_search_with_llm(search_results, instruction + RECORDS_INSTRUCTION)
+                processed_data, records = self._extract_records(processed_data)
             except Exception as e:
                 processed_data = f"AI processing error: {e}"
         return {
             "search_results": search_results, 
             "processed_data": processed_data, 
+            "records": records,
+            "result_id": ResultStore.put(query, records),
             "search_query": query, 
             "timestamp": datetime.now().isoformat()
         }
 
+    def _precomputed_route(self, mode: str, departure: str, destination: str, date: Optional[str] = None) -> Optional[Dict]:
+        if not self.use_precomputed:
+            return None
+        return PrecomputedStore.get_route(mode, departure, destination, date)
+
     def get_travel_guide(self, city: str) -> Dict:
+        if self.use_precomputed:
+            cached = PrecomputedStore.get_guide(city)
+            if cached:
+                return cached
         print(f"Creating guide for {city}...")
         yt_query = f"YouTube videos for tourists in {city} attractions and food"
         search_results = self.search_web(yt_query)
@@ -300,6 +365,9 @@ class EnhancedSearchTools:
         }
 
     def search_flights(self, departure: str, destination: str, date: Optional[str] = None) -> Dict:
+        cached = self._precomputed_route('flights', departure, destination, date)
+        if cached:
+            return cached
         return self._execute_search(
             f"flights from {departure} to {destination} on {date or 'today'}", 
             f"Extract flight info for {departure} to {destination}"
@@ -311,31 +379,172 @@ class EnhancedSearchTools:
         instruction = f"Extract hotel information for {city}, including names, ratings, approximate prices, and booking links."
         return self._execute_search(query, instruction)
 
-    def search_intercity_cab(self, departure: str, destination: str, date: Optional[str] = None) -> Dict:
-        return self._execute_search(
+    def estimate_cab_fares(self, departure: str, destination: str, intercity: bool = False) -> Dict:
+        """Instant fare/time estimate from coordinates and the local fare table.
+
+        Intercity trips between two cities the CityIndex can name use their
+        centroids directly; everything else is geocoded.
+        """
+        vehicle_types = OUTSTATION_VEHICLES if intercity else LOCAL_VEHICLES
+        if intercity:
+            dep_city = CityIndex.get(CityIndex.resolve_name(departure) if departure else None)
+            dest_city = CityIndex.get(CityIndex.resolve_name(destination) if destination else None)
+            if dep_city and dest_city and dep_city['key'] != dest_city['key']:
+                try:
+                    return FareEstimator.estimate(tuple(dep_city['centroid']), tuple(dest_city['centroid']), vehicle_types)
+                except Exception as e:
+                    return {"error": f"Fare estimation failed: {e}", "source": "local_estimate"}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dep_details, dest_details = executor.map(LocationService.geocode_location, [departure, destination])
+        if not dep_details or not dest_details:
+            return {"error": "Could not locate departure or destination", "source": "local_estimate"}
+        address = dep_details.get('address', {})
+        city = CityIndex.resolve(departure, dep_details) or address.get('city') or address.get('county')
+        try:
+            return FareEstimator.estimate(
+                (float(dep_details['lat']), float(dep_details['lon'])),
+                (float(dest_details['lat']), float(dest_details['lon'])),
+                vehicle_types,
+                None if intercity else city
+            )
+        except Exception as e:
+            return {"error": f"Fare estimation failed: {e}", "source": "local_estimate"}
+
+    @staticmethod
+    def _describe_estimate(estimate: Dict) -> str:
+        options = ", ".join(
+            f"{o['vehicle_type']}: ~₹{o['estimated_fare_inr']} ({o['estimated_duration_min']} min)"
+            for o in estimate.get('options', [])
+        )
+        return f"Estimated fares for about {estimate.get('distance_km')} km: {options}."
+
+    def _cab_result(self, estimate: Dict, query: str, instruction: str, enrich: bool) -> Dict:
+        # Without a usable estimate there is nothing instant to return, so always search
+        if not enrich and not estimate.get('error'):
+            records = [{
+                "provider": option['vehicle_type'],
+                "name": option['vehicle_type'],
+                "price": option['estimated_fare_inr']
+            } for option in estimate.get('options', [])]
+            return {
+                "search_results": "",
+                "processed_data": self._describe_estimate(estimate),
+                "estimate": estimate,
+                "records": records,
+                "result_id": ResultStore.put(f"estimate:{query}", records),
+                "search_query": query,
+                "timestamp": datetime.now().isoformat()
+            }
+        result = self._execute_search(query, instruction)
+        result["estimate"] = estimate
+        return result
+
+    def search_intercity_cab(self, departure: str, destination: str, date: Optional[str] = None, enrich: bool = True) -> Dict:
+        cached = self._precomputed_route('intercity_cab', departure, destination, date)
+        if cached:
+            return cached
+        estimate = self.estimate_cab_fares(departure, destination, intercity=True)
+        return self._cab_result(
+            estimate,
             f"intercity cab from {departure} to {destination} on {date or 'today'}", 
-            f"Extract intercity cab options for {departure} to {destination}"
+            f"Extract intercity cab options for {departure} to {destination}",
+            enrich
         )
 
-    def search_local_cab(self, departure: str, destination: str) -> Dict:
+    def search_local_cab(self, departure: str, destination: str, enrich: bool = True) -> Dict:
+        estimate = self.estimate_cab_fares(departure, destination)
         query = f"local cab fare from {departure} to {destination} Uber Ola price auto rickshaw"
         instruction = f"""Extract ONLY local cab options from '{departure}' to '{destination}'. 
         Include providers like Ola and Uber, estimate the fare in INR for different vehicle types (Auto, Go, Premier), 
         and mention typical travel time. CRITICAL: IGNORE and DO NOT MENTION any information about flights, hotels, trains, or buses."""
-        return self._execute_search(query, instruction)
+        return self._cab_result(estimate, query, instruction, enrich)
 
     def search_trains(self, departure: str, destination: str, date: Optional[str] = None) -> Dict:
+        cached = self._precomputed_route('trains', departure, destination, date)
+        if cached:
+            return cached
         return self._execute_search(
             f"trains from {departure} to {destination} on {date or 'today'}", 
             f"Extract train info for {departure} to {destination}"
         )
 
     def search_buses(self, departure: str, destination: str, date: Optional[str] = None) -> Dict:
+        cached = self._precomputed_route('buses', departure, destination, date)
+        if cached:
+            return cached
         return self._execute_search(
             f"bus from {departure} to {destination} on {date or 'today'}", 
             f"Extract bus travel options for {departure} to {destination}"
         )
 
+    def plan_multicity(self, stops: List[Dict], modes: Optional[List[str]] = None) -> Dict:
+        """Search every leg of an ordered multi-stop trip concurrently.
+
+        Each stop is {'location': str, 'date': Optional[str]}, where date is the
+        departure date from that stop. Geocodes and identical leg searches are
+        run once and shared between legs.
+        """
+        modes = list(dict.fromkeys(modes or MULTICITY_MODES))
+        invalid = [m for m in modes if m not in MULTICITY_MODES]
+        if invalid:
+            raise ValueError(f"Unsupported modes: {', '.join(map(str, invalid))}")
+        legs = [(stops[i], stops[i + 1]) for i in range(len(stops) - 1)]
+        started = time.perf_counter()
+
+        def timed(func, *args):
+            t0 = time.perf_counter()
+            result = func(*args)
+            return result, round((time.perf_counter() - t0) * 1000, 1)
+
+        locations = list(dict.fromkeys(stop['location'] for stop in stops))
+        search_keys = list(dict.fromkeys(
+            (mode, dep['location'], dest['location'], dep.get('date'))
+            for dep, dest in legs for mode in modes
+        ))
+        workers = max(1, min(MULTICITY_MAX_WORKERS, len(locations) + len(search_keys)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            geocode_futures = {loc: executor.submit(timed, LocationService.geocode_location, loc) for loc in locations}
+            search_futures = {
+                key: executor.submit(timed, getattr(self, f"search_{key[0]}"), key[1], key[2], key[3])
+                for key in search_keys
+            }
+            geocodes = {loc: f.result() for loc, f in geocode_futures.items()}
+            searches = {key: f.result() for key, f in search_futures.items()}
+
+        def coords(location):
+            details = geocodes[location][0]
+            if not details:
+                return None
+            return {'lat': details.get('lat'), 'lon': details.get('lon'), 'display_name': details.get('display_name')}
+
+        plan = []
+        for index, (dep, dest) in enumerate(legs, start=1):
+            leg = {
+                'leg': index,
+                'from': dep['location'],
+                'to': dest['location'],
+                'date': dep.get('date'),
+                'from_coordinates': coords(dep['location']),
+                'to_coordinates': coords(dest['location']),
+                'timing_ms': {}
+            }
+            for mode in modes:
+                result, elapsed = searches[(mode, dep['location'], dest['location'], dep.get('date'))]
+                leg[mode] = result
+                leg['timing_ms'][mode] = elapsed
+            leg['timing_ms']['geocode'] = max(geocodes[dep['location']][1], geocodes[dest['location']][1])
+            leg['timing_ms']['total'] = max(leg['timing_ms'].values())
+            plan.append(leg)
+
+        return {
+            'stops': [stop['location'] for stop in stops],
+            'legs': plan,
+            'unique_searches': len(search_keys),
+            'total_ms': round((time.perf_counter() - started) * 1000, 1),
+            'generated_at': datetime.now().isoformat()
+        }
+
     def generate_intelligent_itinerary(self, travel_state: TravelState) -> Dict:
         departure_str = travel_state.get('departure_location', '')
         destination_str = travel_state.get('destination_location', 'Your Destination')
@@ -353,11 +562,29 @@ class EnhancedSearchTools:
             except (ValueError, TypeError):
                 duration_in_days = 3
 
-        departure_details = LocationService.geocode_location(departure_str)
-        destination_details = LocationService.geocode_location(destination_str)
-        
+        if self.use_precomputed:
+            cached = PrecomputedStore.get_itinerary(departure_str, destination_str, duration_in_days)
+            if cached:
+                return {
+                    **cached,
+                    "traveler": user_profile.get('name', 'Traveler')
+                }
+
+        # Resolve both places against the bundled city index; only geocode what it can't name
+        dep_key = CityIndex.resolve_name(departure_str) if departure_str else None
+        dest_key = CityIndex.resolve_name(destination_str) if destination_str else None
+        departure_details = destination_details = None
+        if not dep_key:
+            departure_details = LocationService.geocode_location(departure_str)
+            dep_key = CityIndex.resolve(details=departure_details)
+        if not dest_key:
+            destination_details = LocationService.geocode_location(destination_str)
+            dest_key = CityIndex.resolve(details=destination_details)
+
         is_intracity = False
-        if departure_details and destination_details:
+        if dep_key and dest_key:
+            is_intracity = dep_key == dest_key
+        elif departure_details and destination_details:
             dep_city = departure_details.get('address', {}).get('city') or departure_details.get('address', {}).get('county')
             dest_city = destination_details.get('address', {}).get('city') or destination_details.get('address', {}).get('county')
             if dep_city and dest_city and dep_city.lower() == dest_city.lower():
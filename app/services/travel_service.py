@@ -5,6 +5,8 @@ from typing import Dict, Any, Optional
 # In-memory storage for sessions
 sessions_db = {}
 travel_states_db = {}
+# Bumped on every change to a session or its travel state; used for ETags
+session_versions = {}
 
 class SessionService:
     @staticmethod
@@ -43,6 +45,7 @@ class SessionService:
             'guide_data': None
         }
         travel_states_db[session_key] = travel_state
+        session_versions[session_key] = 1
         
         return session
     
@@ -50,6 +53,10 @@ class SessionService:
     def get_session(session_key: str) -> Optional[Dict[str, Any]]:
         return sessions_db.get(session_key)
     
+    @staticmethod
+    def get_version(session_key: str) -> Optional[int]:
+        return session_versions.get(session_key)
+    
     @staticmethod
     def get_travel_state(session_key: str) -> Optional[Dict[str, Any]]:
         return travel_states_db.get(session_key)
@@ -58,5 +65,6 @@ class SessionService:
     def update_travel_state(session_key: str, updates: Dict[str, Any]):
         if session_key in travel_states_db:
             travel_states_db[session_key].update(updates)
+            session_versions[session_key] = session_versions.get(session_key, 0) + 1
             return True
         return False
\ No newline at end of file
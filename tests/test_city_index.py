@@ -0,0 +1,39 @@
+import pytest
+from app.services.city_index import CityIndex
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Pune", "pune"),
+    ("Bombay", "mumbai"),
+    ("Koregaon Park, Pune", "pune"),
+    ("Koregaon Park", "pune"),
+    ("Baga Beach, Goa", "goa"),
+    ("Andheri East, Maharashtra", "mumbai"),
+    ("Dwarka, Delhi, India", "delhi"),
+    ("Pune 411001, Maharashtra", "pune"),
+])
+def test_resolve_name_known_places(text, expected):
+    assert CityIndex.resolve_name(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Dwarka, Gujarat",
+    "Salt Lake City, Utah",
+    "Hyderabad, Sindh, Pakistan",
+    "Salt Lake City",
+    "Mumbai, Delhi",
+    "Timbuktu",
+    "",
+])
+def test_resolve_name_defers_to_geocoding(text):
+    assert CityIndex.resolve_name(text) is None
+
+
+def test_locate_prefers_smallest_containing_city():
+    assert CityIndex.locate(18.52, 73.85) == "pune"
+    assert CityIndex.locate(19.20, 72.97) == "thane"
+    assert CityIndex.locate(0.0, 0.0) is None
+
+
+def test_resolve_falls_back_to_coordinates():
+    assert CityIndex.resolve("Some Unknown Place", {'lat': '12.97', 'lon': '77.59'}) == "bengaluru"
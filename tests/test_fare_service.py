@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from app.services import fare_service
+from app.services.fare_service import FareEstimator, LOCAL_VEHICLES, OUTSTATION_VEHICLES
+
+PUNE = (18.5204, 73.8567)
+MUMBAI = (19.0760, 72.8777)
+DELHI = (28.6139, 77.2090)
+
+
+def test_distance_matrix_known_pairs():
+    distances = FareEstimator.distance_matrix([PUNE, MUMBAI], [MUMBAI, DELHI, PUNE])
+    assert distances.shape == (2, 3)
+    assert distances[0, 0] == pytest.approx(120, abs=5)
+    assert distances[1, 1] == pytest.approx(1150, abs=20)
+    assert distances[0, 2] == pytest.approx(0, abs=1e-6)
+    assert distances[0, 0] == pytest.approx(distances[1, 2])
+
+
+def test_estimate_matrix_broadcasts_over_vehicles():
+    result = FareEstimator.estimate_matrix([PUNE, MUMBAI], [MUMBAI, DELHI, PUNE], OUTSTATION_VEHICLES)
+    assert result['distance_km'].shape == (2, 3)
+    assert result['fare_inr'].shape == (2, 3, 2)
+    assert result['duration_min'].shape == (2, 3, 2)
+    assert np.allclose(result['distance_km'], FareEstimator.distance_matrix([PUNE, MUMBAI], [MUMBAI, DELHI, PUNE]) * fare_service.ROAD_FACTOR)
+
+
+def test_min_fare_floor_applies_to_short_trips():
+    result = FareEstimator.estimate_matrix([PUNE], [PUNE], OUTSTATION_VEHICLES)
+    default = FareEstimator.fare_table['default']
+    assert result['fare_inr'][0, 0].tolist() == [default[v]['min_fare'] for v in OUTSTATION_VEHICLES]
+
+
+def test_city_rates_override_defaults(monkeypatch):
+    table = {
+        'default': {'Auto': {'base': 0, 'per_km': 10, 'per_min': 0, 'min_fare': 0, 'avg_speed_kmh': 60}},
+        'pune': {'Auto': {'per_km': 20}},
+    }
+    monkeypatch.setattr(FareEstimator, 'fare_table', table)
+    default_fare = FareEstimator.estimate_matrix([PUNE], [MUMBAI], ['Auto'])['fare_inr'][0, 0, 0]
+    pune_fare = FareEstimator.estimate_matrix([PUNE], [MUMBAI], ['Auto'], city='Pune')['fare_inr'][0, 0, 0]
+    assert pune_fare == pytest.approx(default_fare * 2)
+
+
+def test_unknown_vehicle_type_raises():
+    with pytest.raises(ValueError):
+        FareEstimator.estimate(PUNE, MUMBAI, ('Auto', 'Helicopter'))
+
+
+def test_estimate_reports_each_vehicle():
+    estimate = FareEstimator.estimate(PUNE, (18.56, 73.91), LOCAL_VEHICLES, city='Pune')
+    assert [o['vehicle_type'] for o in estimate['options']] == list(LOCAL_VEHICLES)
+    assert all(o['estimated_fare_inr'] > 0 for o in estimate['options'])
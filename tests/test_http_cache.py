@@ -0,0 +1,84 @@
+import gzip
+import json
+from unittest import mock
+import pytest
+from app import create_app
+from app import http_cache
+from app.api import travel
+from app.services.result_store import ResultStore
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(http_cache, 'BROTLI_AVAILABLE', False)
+    return create_app().test_client()
+
+
+def _session(client):
+    return client.post('/api/travel/sessions/create', json={'user_id': 'u1'}).json['session_key']
+
+
+def test_session_get_returns_304_for_matching_etag(client):
+    key = _session(client)
+    first = client.get(f'/api/travel/sessions/current/{key}')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    second = client.get(f'/api/travel/sessions/current/{key}', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['Cache-Control'] == first.headers['Cache-Control']
+    assert 'Accept-Encoding' in second.headers['Vary']
+
+
+def test_compressed_etag_suffix_still_revalidates(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'COMPRESS_MIN_SIZE', 10)
+    with mock.patch('app.services.search_service.LocationService.create_map', return_value='x' * 5000):
+        first = client.get('/api/travel/map?lat=18.5&lon=73.8', headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert first.headers['ETag'].endswith('-gzip"')
+        assert json.loads(gzip.decompress(first.data))['map_base64'] == 'x' * 5000
+
+        again = client.get('/api/travel/map?lat=18.5&lon=73.8',
+                           headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.headers['Cache-Control'] == first.headers['Cache-Control']
+
+
+def test_body_hash_etag_with_suffix_revalidates(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'COMPRESS_MIN_SIZE', 10)
+    result_id = ResultStore.put('etag test', [{'provider': f'P{i}', 'price': i} for i in range(20)])
+    first = client.get(f'/api/services/results/{result_id}', headers={'Accept-Encoding': 'gzip'})
+    assert first.headers['Content-Encoding'] == 'gzip'
+    again = client.get(f'/api/services/results/{result_id}',
+                       headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_small_bodies_stay_uncompressed(client):
+    key = _session(client)
+    response = client.get(f'/api/travel/sessions/current/{key}', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < http_cache.COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.data)['session_key'] == key
+
+
+def test_failed_map_is_not_revalidated(client):
+    with mock.patch('app.services.search_service.LocationService.create_map', return_value=''):
+        response = client.get('/api/travel/map')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_sse_stream_is_not_buffered_or_compressed(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'COMPRESS_MIN_SIZE', 1)
+    with mock.patch.object(travel.search_tools, 'get_travel_guide', return_value={'city': 'Goa'}):
+        job = client.post('/api/travel/guide?async=true', json={'destination': 'Goa'}).json
+        response = client.get(job['events_url'], headers={'Accept-Encoding': 'gzip'}, buffered=False)
+        assert response.is_streamed
+        body = response.get_data()
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+    assert 'ETag' not in response.headers
+    assert b'event: completed' in body
@@ -0,0 +1,77 @@
+import threading
+import time
+import pytest
+from app.services import job_service
+from app.services.job_service import JobService, JobQueueFull
+
+
+@pytest.fixture(autouse=True)
+def clean_jobs():
+    job_service.jobs_db.clear()
+    job_service._job_events.clear()
+    yield
+    job_service.jobs_db.clear()
+    job_service._job_events.clear()
+
+
+def _wait_for_status(job_id, status, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = JobService.get_job(job_id)
+        if job and job['status'] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_job_moves_from_pending_to_running_to_completed():
+    release = threading.Event()
+    job = JobService.submit('test', lambda: release.wait(2) and {'ok': True})
+    assert job['status'] == JobService.PENDING
+
+    _wait_for_status(job['job_id'], JobService.RUNNING)
+    release.set()
+    assert JobService.wait(job['job_id'], 2)
+    finished = JobService.get_job(job['job_id'])
+    assert finished['status'] == JobService.COMPLETED
+    assert finished['result'] == {'ok': True}
+    assert finished['expires_at']
+    assert not any(key.startswith('_') for key in finished)
+
+
+def test_raised_exception_marks_job_failed():
+    def boom():
+        raise RuntimeError('upstream down')
+    job = JobService.submit('test', boom)
+    assert JobService.wait(job['job_id'], 2)
+    failed = JobService.get_job(job['job_id'])
+    assert failed['status'] == JobService.FAILED
+    assert failed['error'] == 'upstream down'
+
+
+def test_error_result_marks_job_failed():
+    job = JobService.submit('test', lambda: {'error': 'geocoding failed'})
+    assert JobService.wait(job['job_id'], 2)
+    failed = JobService.get_job(job['job_id'])
+    assert failed['status'] == JobService.FAILED
+    assert failed['error'] == 'geocoding failed'
+
+
+def test_queue_limit_rejects_new_jobs(monkeypatch):
+    monkeypatch.setattr(job_service, 'JOB_QUEUE_LIMIT', 2)
+    release = threading.Event()
+    jobs = [JobService.submit('test', release.wait, 2) for _ in range(2)]
+    with pytest.raises(JobQueueFull):
+        JobService.submit('test', release.wait, 2)
+    release.set()
+    for job in jobs:
+        assert JobService.wait(job['job_id'], 2)
+
+
+def test_finished_jobs_are_purged_after_ttl(monkeypatch):
+    monkeypatch.setattr(job_service, 'JOB_RESULT_TTL', 0)
+    job = JobService.submit('test', lambda: {'ok': True})
+    assert JobService.wait(job['job_id'], 2)
+    time.sleep(0.01)
+    assert JobService.get_job(job['job_id']) is None
+    assert job['job_id'] not in job_service._job_events
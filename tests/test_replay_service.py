@@ -0,0 +1,69 @@
+import json
+import os
+import time
+import zlib
+import pytest
+from app.services.replay_service import ProviderReplay, ReplayMiss
+
+
+def _record(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROVIDER_REPLAY_MODE', 'record')
+    monkeypatch.setenv('PROVIDER_CASSETTE_DIR', str(tmp_path))
+    slow = ProviderReplay.call('groq', {'prompt': 'slow'}, lambda: (time.sleep(0.2), 'slow answer')[1])
+    fast = ProviderReplay.call('groq', {'prompt': 'fast'}, lambda: {'choices': ['fast answer']})
+    return slow, fast
+
+
+def test_record_writes_indexed_compressed_cassette(monkeypatch, tmp_path):
+    assert _record(monkeypatch, tmp_path) == ('slow answer', {'choices': ['fast answer']})
+
+    with open(tmp_path / 'groq.idx', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    data = (tmp_path / 'groq.dat').read_bytes()
+    assert [e['o'] for e in entries] == [0, entries[0]['n']]
+    assert len(data) == entries[0]['n'] + entries[1]['n']
+    assert entries[0]['ms'] >= 190
+
+    first = json.loads(zlib.decompress(data[entries[0]['o']:entries[0]['o'] + entries[0]['n']]))
+    assert first == {'request': {'prompt': 'slow'}, 'response': 'slow answer'}
+
+
+def test_duplicate_requests_are_recorded_once(monkeypatch, tmp_path):
+    _record(monkeypatch, tmp_path)
+    ProviderReplay.call('groq', {'prompt': 'fast'}, lambda: 'different')
+    assert len((tmp_path / 'groq.idx').read_text().splitlines()) == 2
+
+
+def test_replay_serves_recorded_responses_without_calling_provider(monkeypatch, tmp_path):
+    _record(monkeypatch, tmp_path)
+    monkeypatch.setenv('PROVIDER_REPLAY_MODE', 'replay')
+
+    def live():
+        raise AssertionError('provider must not be called while replaying')
+
+    assert ProviderReplay.call('groq', {'prompt': 'fast'}, live) == {'choices': ['fast answer']}
+    with pytest.raises(ReplayMiss):
+        ProviderReplay.call('groq', {'prompt': 'never recorded'}, live)
+    with pytest.raises(ReplayMiss):
+        ProviderReplay.call('tavily', {'query': 'q'}, live)
+
+
+def test_recorded_latency_is_reproduced_only_when_enabled(monkeypatch, tmp_path):
+    _record(monkeypatch, tmp_path)
+    monkeypatch.setenv('PROVIDER_REPLAY_MODE', 'replay')
+
+    started = time.perf_counter()
+    assert ProviderReplay.call('groq', {'prompt': 'slow'}, None) == 'slow answer'
+    assert time.perf_counter() - started < 0.1
+
+    monkeypatch.setenv('PROVIDER_REPLAY_LATENCY', 'true')
+    started = time.perf_counter()
+    assert ProviderReplay.call('groq', {'prompt': 'slow'}, None) == 'slow answer'
+    assert time.perf_counter() - started >= 0.18
+
+
+def test_off_mode_calls_provider_and_writes_nothing(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROVIDER_REPLAY_MODE', 'off')
+    monkeypatch.setenv('PROVIDER_CASSETTE_DIR', str(tmp_path))
+    assert ProviderReplay.call('groq', {'prompt': 'x'}, lambda: 'live') == 'live'
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,32 @@
+import pytest
+from app.services.result_store import ResultStore
+
+RECORDS = [
+    {'provider': 'IndiGo', 'price': '₹4,500', 'departure_time': '09:10', 'rating': 4.1},
+    {'provider': 'Air India', 'price': 6200, 'departure_time': '07:00'},
+    {'provider': 'SpiceJet'},
+]
+
+
+def test_query_filters_sorts_and_pages():
+    result_id = ResultStore.put('flights pune goa', RECORDS)
+    cheap = ResultStore.query(result_id, {'max_price': '5000'})
+    assert [r['provider'] for r in cheap['records']] == ['IndiGo']
+    by_price = ResultStore.query(result_id, {'sort': '-price', 'limit': '2'})
+    assert by_price['total'] == 3
+    assert [r['provider'] for r in by_price['records']] == ['Air India', 'IndiGo']
+
+
+def test_unknown_result_id_returns_none():
+    assert ResultStore.query('not-a-result', {}) is None
+
+
+@pytest.mark.parametrize('params', [
+    {'min_price': 'abc'},
+    {'max_price': 'nan'},
+    {'limit': 'ten'},
+    {'sort': 'colour'},
+])
+def test_parse_params_rejects_bad_input(params):
+    with pytest.raises(ValueError):
+        ResultStore.parse_params(params)
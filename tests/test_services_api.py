@@ -0,0 +1,46 @@
+from unittest import mock
+import pytest
+from app import create_app
+from app.api import services
+
+ESTIMATE = {
+    'distance_km': 10.0,
+    'city': 'pune',
+    'options': [
+        {'vehicle_type': 'Auto', 'estimated_fare_inr': 250, 'estimated_duration_min': 30},
+        {'vehicle_type': 'Go', 'estimated_fare_inr': 300, 'estimated_duration_min': 27},
+        {'vehicle_type': 'Premier', 'estimated_fare_inr': 380, 'estimated_duration_min': 27},
+    ],
+    'source': 'local_estimate'
+}
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+def test_local_cab_estimate_is_refinable(client):
+    with mock.patch.object(services.search_tools, 'estimate_cab_fares', return_value=ESTIMATE):
+        response = client.post('/api/services/cabs/local?max_price=310&sort=-price&limit=1',
+                               json={'departure': 'Kothrud, Pune', 'destination': 'Baner, Pune'})
+    assert response.status_code == 200
+    assert response.json['total'] == 2
+    assert [r['provider'] for r in response.json['records']] == ['Go']
+    assert response.json['processed_data']
+
+    refined = client.get(f"/api/services/results/{response.json['result_id']}?sort=price")
+    assert [r['provider'] for r in refined.json['records']] == ['Auto', 'Go', 'Premier']
+
+
+def test_refinement_without_records_is_rejected(client):
+    with mock.patch.object(services.search_tools, 'search_local_cab', return_value={'estimate': {}}):
+        response = client.post('/api/services/cabs/local?limit=1', json={'departure': 'a', 'destination': 'b'})
+    assert response.status_code == 400
+
+
+def test_invalid_filter_rejected_before_search(client):
+    with mock.patch.object(services.search_tools, 'search_flights') as search:
+        response = client.post('/api/services/flights/search?min_price=abc', json={'departure': 'Pune'})
+    assert response.status_code == 400
+    assert not search.called
@@ -0,0 +1,20 @@
+import pytest
+from app import create_app
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize('body', [
+    {'stops': ['Pune', {'location': ['Goa']}]},
+    {'stops': ['Pune', {'location': '  '}]},
+    {'stops': [{'location': 'Pune', 'date': {'day': 1}}, 'Goa']},
+    {'stops': ['Pune']},
+    {'stops': ['Pune', 'Goa'], 'modes': 'flights'},
+    {'stops': ['Pune', 'Goa'], 'modes': ['hotels']},
+])
+def test_multicity_rejects_malformed_requests(client, body):
+    response = client.post('/api/travel/multicity', json=body)
+    assert response.status_code == 400